@@ -9,12 +9,14 @@ from PyQt5.QtWidgets import (
     QToolBar, QLabel, QFileDialog, QMessageBox,
     QColorDialog, QFontDialog, QInputDialog,
     QWidget, QVBoxLayout, QPushButton, QLineEdit,
-    QCheckBox, QDockWidget
+    QCheckBox, QDockWidget, QProgressBar
 )
 
 # Importar componentes reutilizables
 from contadorWidget import WordCounterWidget
 from audioWidget import AudioWidget
+from historialEdicion import HistorialEdicion
+from exportador import Exportador, FORMATOS
 
 
 class MiniWord(QMainWindow):
@@ -28,9 +30,26 @@ class MiniWord(QMainWindow):
         self.text_area = QTextEdit()
         self.setCentralWidget(self.text_area)
 
+        # Historial de deshacer/rehacer con memoria acotada y persistente.
+        # Solo registra texto, así que el editor es de texto plano
+        # (al pegar, el contenido se inserta sin formato)
+        self.text_area.setAcceptRichText(False)
+        self.historial = HistorialEdicion(self.text_area, presupuesto_bytes=4 * 1024 * 1024)
+
+        # Menú contextual propio para que Deshacer/Rehacer usen el historial
+        self.text_area.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.text_area.customContextMenuRequested.connect(self.mostrar_menu_contextual)
+
        
         self.highlight_selections = []
 
+        # Exportaciones en segundo plano (PDF / HTML / Markdown)
+        self.exportador = Exportador(parent=self)
+        self.exportador.progresoCambiado.connect(self.on_progreso_exportacion)
+        self.exportador.errorExportacion.connect(self.on_error_exportacion)
+        self.exportador.exportacionFinalizada.connect(self.on_exportacion_finalizada)
+        self.cerrar_tras_exportar = False
+
         
         self.create_menu()
         self.create_toolbar()
@@ -57,6 +76,17 @@ class MiniWord(QMainWindow):
         act_guardar.triggered.connect(self.guardar)
         menu_archivo.addAction(act_guardar)
 
+        menu_exportar = menu_archivo.addMenu("Exportar")
+        for formato, (_, descripcion) in FORMATOS.items():
+            act_exportar = QAction(descripcion.split(" (")[0], self)
+            act_exportar.triggered.connect(lambda _, f=formato: self.exportar(f))
+            menu_exportar.addAction(act_exportar)
+
+        menu_exportar.addSeparator()
+        act_exportar_lote = QAction("Exportar varios archivos...", self)
+        act_exportar_lote.triggered.connect(self.exportar_lote)
+        menu_exportar.addAction(act_exportar_lote)
+
         menu_archivo.addSeparator()
         act_salir = QAction("Salir", self)
         act_salir.triggered.connect(self.close)
@@ -66,11 +96,19 @@ class MiniWord(QMainWindow):
 
         act_deshacer = QAction("Deshacer", self)
         act_deshacer.setShortcut(QKeySequence.Undo)
-        act_deshacer.triggered.connect(self.text_area.undo)
+        act_deshacer.triggered.connect(self.historial.deshacer)
+        act_deshacer.setEnabled(False)
+        self.historial.puedeDeshacerCambiado.connect(act_deshacer.setEnabled)
 
         act_rehacer = QAction("Rehacer", self)
         act_rehacer.setShortcut(QKeySequence.Redo)
-        act_rehacer.triggered.connect(self.text_area.redo)
+        act_rehacer.triggered.connect(self.historial.rehacer)
+        act_rehacer.setEnabled(False)
+        self.historial.puedeRehacerCambiado.connect(act_rehacer.setEnabled)
+
+        # También se usan en el menú contextual del editor
+        self.act_deshacer = act_deshacer
+        self.act_rehacer = act_rehacer
 
         menu_editar.addAction(act_deshacer)
         menu_editar.addAction(act_rehacer)
@@ -152,7 +190,19 @@ class MiniWord(QMainWindow):
         # (Opcional) Conectar la señal para logging o procesamiento adicional
         # self.word_counter.conteoActualizado.connect(self.on_conteo_actualizado)
 
+        # Progreso y cancelación de las exportaciones (ocultos en reposo)
+        self.export_progress = QProgressBar()
+        self.export_progress.setRange(0, 100)
+        self.export_progress.setMaximumWidth(150)
+        self.export_progress.setVisible(False)
+
+        self.btn_cancelar_export = QPushButton("Cancelar exportación")
+        self.btn_cancelar_export.clicked.connect(self.exportador.cancelar)
+        self.btn_cancelar_export.setVisible(False)
+
         barra_estado = self.statusBar()
+        barra_estado.addPermanentWidget(self.export_progress)
+        barra_estado.addPermanentWidget(self.btn_cancelar_export)
         barra_estado.addPermanentWidget(QLabel(platform.system()))
         barra_estado.addPermanentWidget(self.word_counter)
         barra_estado.showMessage("Listo.", 3000)
@@ -163,7 +213,8 @@ class MiniWord(QMainWindow):
 
     
     def nuevo(self):
-        self.text_area.clear()
+        with self.historial.reemplazo_documento():
+            self.text_area.clear()
         self.current_file = ""
         self.statusBar().showMessage("Documento nuevo.")
 
@@ -172,9 +223,15 @@ class MiniWord(QMainWindow):
         if file_path:
             try:
                 with open(file_path, "r", encoding="utf-8") as f:
-                    self.text_area.setPlainText(f.read())
+                    texto = f.read()
+                with self.historial.reemplazo_documento():
+                    self.text_area.setPlainText(texto)
                 self.current_file = file_path
-                self.statusBar().showMessage("Archivo abierto.")
+                self.text_area.document().setModified(False)
+                if self.historial.cargar(file_path):
+                    self.statusBar().showMessage("Archivo abierto (historial restaurado).")
+                else:
+                    self.statusBar().showMessage("Archivo abierto.")
                 self.clear_highlight()
             except Exception:
                 QMessageBox.warning(self, "Error", "No se pudo abrir el archivo.")
@@ -187,10 +244,71 @@ class MiniWord(QMainWindow):
         try:
             with open(self.current_file, "w", encoding="utf-8") as f:
                 f.write(self.text_area.toPlainText())
+            self.text_area.document().setModified(False)
+            self.historial.guardar(self.current_file)
             self.statusBar().showMessage("Archivo guardado.")
         except Exception:
             QMessageBox.warning(self, "Error", "No se pudo guardar el archivo.")
 
+    def exportar(self, formato):
+        extension, filtro = FORMATOS[formato]
+        base = os.path.splitext(self.current_file)[0] if self.current_file else "documento"
+        destino, _ = QFileDialog.getSaveFileName(self, "Exportar", base + extension, filtro)
+        if not destino:
+            return
+        if not os.path.splitext(destino)[1]:
+            destino += extension
+        estaba_ocupado = self.exportador.ocupado()
+        try:
+            self.exportador.exportar_documento(self.text_area.document(), destino, formato)
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        if not estaba_ocupado:
+            self.mostrar_progreso_exportacion(True)
+        self.statusBar().showMessage(f"Exportando a {os.path.basename(destino)}...")
+
+    def exportar_lote(self):
+        origenes, _ = QFileDialog.getOpenFileNames(self, "Archivos a exportar")
+        if not origenes:
+            return
+        descripciones = [descripcion for _, descripcion in FORMATOS.values()]
+        elegido, ok = QInputDialog.getItem(self, "Exportar varios archivos", "Formato:",
+                                           descripciones, 0, False)
+        if not ok:
+            return
+        carpeta = QFileDialog.getExistingDirectory(self, "Carpeta de destino")
+        if not carpeta:
+            return
+        formato = list(FORMATOS)[descripciones.index(elegido)]
+        estaba_ocupado = self.exportador.ocupado()
+        try:
+            self.exportador.exportar_lote(origenes, carpeta, formato)
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        if not estaba_ocupado:
+            self.mostrar_progreso_exportacion(True)
+        self.statusBar().showMessage(f"Exportando {len(origenes)} archivo(s)...")
+
+    def mostrar_progreso_exportacion(self, visible):
+        # El valor lo fija el Exportador al lanzar cada tarea; no se reinicia
+        # aquí para no retroceder si ya había exportaciones en curso
+        self.export_progress.setVisible(visible)
+        self.btn_cancelar_export.setVisible(visible)
+
+    def on_progreso_exportacion(self, porcentaje):
+        self.export_progress.setValue(porcentaje)
+
+    def on_error_exportacion(self, destino, mensaje):
+        QMessageBox.warning(self, "Error", f"No se pudo exportar {os.path.basename(destino)}:\n{mensaje}")
+
+    def on_exportacion_finalizada(self, correctas, total):
+        self.mostrar_progreso_exportacion(False)
+        self.statusBar().showMessage(f"Exportados {correctas} de {total} archivo(s).", 5000)
+        if self.cerrar_tras_exportar:
+            self.close()
+
    
     def create_search_panel(self):
         dock = QDockWidget("Buscar / Reemplazar avanzado", self)
@@ -245,6 +363,18 @@ class MiniWord(QMainWindow):
         dock.setWidget(panel)
         self.addDockWidget(Qt.RightDockWidgetArea, dock)
 
+    def mostrar_menu_contextual(self, pos):
+        menu = self.text_area.createStandardContextMenu(pos)
+        # Las entradas estándar usan la pila de Qt, desactivada por el historial
+        reemplazos = {"edit-undo": self.act_deshacer, "edit-redo": self.act_rehacer}
+        for accion in menu.actions():
+            propia = reemplazos.get(accion.objectName())
+            if propia is not None:
+                menu.insertAction(accion, propia)
+                menu.removeAction(accion)
+        menu.exec_(self.text_area.viewport().mapToGlobal(pos))
+        menu.deleteLater()
+
     def focus_search_input(self):
         self.buscar_input.setFocus()
 
@@ -342,17 +472,23 @@ class MiniWord(QMainWindow):
 
       
         count = 0
+        pos = 0
         flags = self.get_find_flags()
 
+        # Un único bloque de edición: Qt notifica un solo cambio al terminar
+        # y todas las sustituciones se deshacen en un único paso
+        bloque = QTextCursor(document)
+        self.historial.iniciar_grupo()
+        bloque.beginEditBlock()
         while True:
             cursor = document.find(buscar, pos, flags)
             if cursor.isNull():
                 break
-            cursor.beginEditBlock()
             cursor.insertText(reemplazar)
-            cursor.endEditBlock()
             count += 1
             pos = cursor.position() 
+        bloque.endEditBlock()
+        self.historial.terminar_grupo()
 
         self.statusBar().showMessage(f"Reemplazadas {count} ocurrencia(s).")
         self.clear_highlight()
@@ -378,11 +514,26 @@ class MiniWord(QMainWindow):
         cursor.insertText(texto + " ")
         self.statusBar().showMessage(f"Dictado: {texto[:50]}{'...' if len(texto) > 50 else ''}", 3000)
 
+    def closeEvent(self, event):
+        # No dejar exportaciones a medias al salir. Se cancelan y la ventana
+        # se cierra cuando terminan, sin bloquear la interfaz mientras tanto.
+        if self.exportador.ocupado():
+            self.cerrar_tras_exportar = True
+            self.exportador.cancelar()
+            self.statusBar().showMessage("Cancelando exportaciones antes de salir...")
+            event.ignore()
+            return
+        # Conservar el historial si el documento coincide con el archivo guardado
+        if self.current_file and not self.text_area.document().isModified():
+            self.historial.guardar(self.current_file)
+        super().closeEvent(event)
+
     # Método update_word_count() eliminado - ahora usa WordCounterWidget
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    app.setApplicationName("MiniWord")
     ventana = MiniWord()
     ventana.resize(900, 600)
     ventana.show()
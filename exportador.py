@@ -0,0 +1,422 @@
+import os
+import re
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThread, QThreadPool, QSizeF, QRectF, pyqtSignal
+from PyQt5.QtGui import QPainter, QPageSize, QPdfWriter, QTextDocument
+
+
+# Formatos soportados: clave -> (extensión, descripción para diálogos)
+FORMATOS = {
+    "pdf": (".pdf", "Documento PDF (*.pdf)"),
+    "html": (".html", "Página web (*.html *.htm)"),
+    "md": (".md", "Markdown (*.md)"),
+}
+
+# Tamaño de los bloques escritos en disco para HTML y Markdown
+_TAMANO_BLOQUE = 64 * 1024
+
+# Resolución del PDF. Con la de QPdfWriter por defecto (1200 ppp) las
+# coordenadas de maquetación de Qt desbordan hacia las 2.500 páginas
+_RESOLUCION_PDF = 300
+
+# Párrafos maquetados en cada paso antes de comprobar la cancelación
+_BLOQUES_POR_PASO = 200
+
+# Sufijo del archivo en el que se escribe antes de renombrarlo al destino
+_SUFIJO_TEMPORAL = ".part"
+
+# Caracteres con significado en Markdown en cualquier posición
+_ESPECIALES_MD = re.compile(r"([\\`*_\[\]<>&|~])")
+
+# Marcadores de bloque al inicio de línea: títulos, citas, listas, subrayados
+_MARCADOR_MD = re.compile(r"[#>+\-=]|\d+(?=[.)])")
+
+
+class ExportacionCancelada(Exception):
+    """
+    Se lanza dentro del hilo de trabajo cuando se cancela una exportación.
+    """
+
+
+def formato_desde_ruta(ruta):
+    """
+    Deduce el formato de exportación a partir de la extensión de la ruta.
+
+    Args:
+        ruta (str): Ruta de destino
+
+    Returns:
+        str | None: Clave de FORMATOS o None si la extensión no es conocida
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == ".htm":
+        return "html"
+    for formato, (ext, _) in FORMATOS.items():
+        if ext == extension:
+            return formato
+    return None
+
+
+def _exportar_pdf(documento, destino, informar):
+    """
+    Pinta el documento página a página en un QPdfWriter.
+
+    La maquetación se fuerza por tramos de párrafos en lugar de con una
+    sola llamada a `pageCount()`: entre tramos se comprueba la cancelación
+    y se libera el GIL, que PyQt mantiene durante cada llamada a Qt y que
+    la interfaz necesita para seguir respondiendo. La primera mitad del
+    progreso corresponde a la maquetación y la segunda a las páginas.
+    """
+    informar(0, 1)
+    escritor = QPdfWriter(destino)
+    painter = None
+    try:
+        escritor.setPageSize(QPageSize(QPageSize.A4))
+        escritor.setResolution(_RESOLUCION_PDF)
+        # `destino` es el archivo temporal: el título es el nombre final
+        final = destino[:-len(_SUFIJO_TEMPORAL)] if destino.endswith(_SUFIJO_TEMPORAL) else destino
+        escritor.setTitle(os.path.splitext(os.path.basename(final))[0])
+
+        maquetacion = documento.documentLayout()
+        maquetacion.setPaintDevice(escritor)
+        area = escritor.pageLayout().paintRectPixels(escritor.resolution())
+        documento.setPageSize(QSizeF(area.width(), area.height()))
+        alto = area.height()
+
+        bloques = documento.blockCount()
+        for numero in range(0, bloques, _BLOQUES_POR_PASO):
+            informar(numero, 2 * bloques)
+            maquetacion.blockBoundingRect(documento.findBlockByNumber(numero))
+        paginas = documento.pageCount()
+
+        painter = QPainter(escritor)
+        for pagina in range(paginas):
+            informar(paginas + pagina, 2 * paginas)
+            if pagina:
+                escritor.newPage()
+            painter.save()
+            painter.translate(0, -pagina * alto)
+            documento.drawContents(painter, QRectF(0, pagina * alto, area.width(), alto))
+            painter.restore()
+    finally:
+        if painter is not None:
+            painter.end()
+        # Liberar el escritor ya para que el archivo se cierre aunque
+        # la traza de una excepción mantenga vivo este marco
+        del painter, escritor
+
+
+def _escribir_texto(texto, destino, informar):
+    """
+    Escribe el texto en bloques, informando del progreso entre bloques.
+    """
+    total = max(1, len(texto))
+    with open(destino, "w", encoding="utf-8") as f:
+        for inicio in range(0, len(texto), _TAMANO_BLOQUE):
+            informar(inicio, total)
+            f.write(texto[inicio:inicio + _TAMANO_BLOQUE])
+
+
+def _exportar_html(documento, destino, informar):
+    # PyQt5 espera la codificación como bytes (QByteArray)
+    _escribir_texto(documento.toHtml(b"utf-8"), destino, informar)
+
+
+def _escapar_markdown(linea):
+    """
+    Escapa una línea de texto plano para que Markdown la muestre tal cual.
+    """
+    linea = _ESPECIALES_MD.sub(r"\\\1", linea)
+    cuerpo = linea.lstrip(" \t")
+    # La sangría se conserva como entidades para que no se convierta en código
+    sangria = linea[:len(linea) - len(cuerpo)].replace(" ", "&#32;").replace("\t", "&#9;")
+    marcador = _MARCADOR_MD.match(cuerpo)
+    if marcador:
+        fin = marcador.end()
+        if cuerpo[0].isdigit():
+            # "1." o "1)" iniciarían una lista numerada
+            cuerpo = cuerpo[:fin] + "\\" + cuerpo[fin:]
+        else:
+            cuerpo = "\\" + cuerpo
+    return sangria + cuerpo
+
+
+def _exportar_markdown(documento, destino, informar):
+    """
+    Escribe cada párrafo del documento (texto plano) como un párrafo de
+    Markdown escapado, de modo que no aparezcan cursivas, títulos, listas
+    ni HTML que el usuario no ha escrito.
+    """
+    total = documento.blockCount()
+    with open(destino, "w", encoding="utf-8") as f:
+        bloque = documento.begin()
+        while bloque.isValid():
+            if bloque.blockNumber() % _BLOQUES_POR_PASO == 0:
+                informar(bloque.blockNumber(), total)
+            f.write(_escapar_markdown(bloque.text()))
+            f.write("\n\n")
+            bloque = bloque.next()
+
+
+_EXPORTADORES = {
+    "pdf": _exportar_pdf,
+    "html": _exportar_html,
+    "md": _exportar_markdown,
+}
+
+
+class SenalesExportacion(QObject):
+    """
+    Señales de una tarea de exportación (QRunnable no es un QObject).
+
+    Señales:
+        progreso(str, int): Ruta de destino y porcentaje completado
+        terminado(str): Emitida con la ruta de destino al finalizar
+        error(str, str): Ruta de destino y descripción del error
+        cancelado(str): Emitida con la ruta de destino si se cancela
+    """
+
+    progreso = pyqtSignal(str, int)
+    terminado = pyqtSignal(str)
+    error = pyqtSignal(str, str)
+    cancelado = pyqtSignal(str)
+
+
+class TareaExportacion(QRunnable):
+    """
+    Exporta un documento en un hilo del QThreadPool sin bloquear la UI.
+
+    Trabaja siempre sobre una copia: o bien un `QTextDocument.clone()` tomado
+    en el hilo de la interfaz, o bien un archivo de texto que se lee en el
+    propio hilo de trabajo (exportación por lotes).
+    """
+
+    def __init__(self, destino, formato, documento=None, origen=None):
+        """
+        Constructor de la tarea.
+
+        Args:
+            destino (str): Ruta del archivo a generar
+            formato (str): Clave de FORMATOS ('pdf', 'html' o 'md')
+            documento (QTextDocument): Documento a exportar (se clona aquí)
+            origen (str): Archivo de texto a exportar si no se pasa documento
+        """
+        super().__init__()
+        # El Exportador conserva la referencia hasta que la tarea termina
+        self.setAutoDelete(False)
+        if formato not in _EXPORTADORES:
+            raise ValueError(f"Formato de exportación no soportado: {formato}")
+
+        self.destino = destino
+        self.formato = formato
+        self.origen = origen
+        self.senales = SenalesExportacion()
+        self._cancelada = threading.Event()
+        self._ultimo_progreso = -1
+
+        self.snapshot = None
+        if documento is not None:
+            # La copia se hace en el hilo de la UI y se deja sin afinidad
+            # de hilo para que el hilo de trabajo pueda adoptarla.
+            self.snapshot = documento.clone()
+            self.snapshot.moveToThread(None)
+
+    def cancelar(self):
+        self._cancelada.set()
+
+    def esta_cancelada(self):
+        return self._cancelada.is_set()
+
+    def _informar(self, hecho, total):
+        if self._cancelada.is_set():
+            raise ExportacionCancelada()
+        porcentaje = int(hecho * 100 / total) if total else 0
+        if porcentaje != self._ultimo_progreso:
+            self._ultimo_progreso = porcentaje
+            self.senales.progreso.emit(self.destino, porcentaje)
+
+    def _preparar_documento(self):
+        if self.snapshot is not None:
+            self.snapshot.moveToThread(QThread.currentThread())
+            return self.snapshot
+        documento = QTextDocument()
+        with open(self.origen, "r", encoding="utf-8") as f:
+            documento.setPlainText(f.read())
+        return documento
+
+    def run(self):
+        """
+        Ejecuta la exportación. Escribe en un archivo temporal y solo lo
+        renombra al destino si termina correctamente.
+        """
+        temporal = self.destino + _SUFIJO_TEMPORAL
+        try:
+            if self._cancelada.is_set():
+                raise ExportacionCancelada()
+            documento = self._preparar_documento()
+            _EXPORTADORES[self.formato](documento, temporal, self._informar)
+            if self._cancelada.is_set():
+                raise ExportacionCancelada()
+            os.replace(temporal, self.destino)
+        except ExportacionCancelada:
+            self._eliminar(temporal)
+            self.senales.cancelado.emit(self.destino)
+        except Exception as e:
+            self._eliminar(temporal)
+            self.senales.error.emit(self.destino, str(e))
+        else:
+            self.senales.progreso.emit(self.destino, 100)
+            self.senales.terminado.emit(self.destino)
+        finally:
+            self.snapshot = None
+
+    @staticmethod
+    def _eliminar(ruta):
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+
+
+class Exportador(QObject):
+    """
+    Gestiona las exportaciones en segundo plano mediante un QThreadPool.
+
+    Señales:
+        progresoCambiado(int): Porcentaje global de las exportaciones en curso
+        archivoExportado(str): Emitida por cada archivo generado correctamente
+        errorExportacion(str, str): Ruta de destino y descripción del error
+        exportacionFinalizada(int, int): Emitida al terminar todas las tareas.
+                                         Parámetros: (correctas, total)
+
+    Parámetros:
+        max_hilos (int): Hilos máximos del pool (default: núcleos - 1)
+        parent (QObject): Objeto padre (opcional)
+    """
+
+    progresoCambiado = pyqtSignal(int)
+    archivoExportado = pyqtSignal(str)
+    errorExportacion = pyqtSignal(str, str)
+    exportacionFinalizada = pyqtSignal(int, int)
+
+    def __init__(self, max_hilos=None, parent=None):
+        """
+        Constructor del exportador.
+
+        Args:
+            max_hilos (int): Hilos máximos del pool
+            parent (QObject): Objeto padre (opcional)
+        """
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        if max_hilos is None:
+            # Dejar un núcleo libre para la interfaz
+            max_hilos = QThread.idealThreadCount() - 1
+        self.pool.setMaxThreadCount(max(1, int(max_hilos)))
+
+        self._tareas = {}
+        self._progreso = {}
+        self._correctas = 0
+        self._total = 0
+
+    def ocupado(self):
+        return bool(self._tareas)
+
+    def exportar_documento(self, documento, destino, formato=None):
+        """
+        Exporta una copia del documento actual en segundo plano.
+
+        Args:
+            documento (QTextDocument): Documento a exportar
+            destino (str): Ruta del archivo a generar
+            formato (str): Clave de FORMATOS; si es None se deduce de la extensión
+        """
+        formato = formato or formato_desde_ruta(destino)
+        self._lanzar(TareaExportacion(destino, formato, documento=documento))
+
+    def exportar_lote(self, origenes, carpeta_destino, formato):
+        """
+        Exporta varios archivos de texto en paralelo.
+
+        Nunca se sobrescribe nada: si el destino ya existe en la carpeta o
+        coincide con el de otro archivo (por ejemplo `a/notas.txt` y
+        `b/notas.txt`), se numera: `notas.pdf`, `notas (2).pdf`... Todos los
+        destinos se calculan antes de lanzar ninguna tarea.
+
+        Args:
+            origenes (list[str]): Archivos de texto a exportar
+            carpeta_destino (str): Carpeta donde se generan los archivos
+            formato (str): Clave de FORMATOS
+        """
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de exportación no soportado: {formato}")
+        extension = FORMATOS[formato][0]
+
+        usados = set(self._tareas)
+        tareas = []
+        for origen in origenes:
+            base = os.path.join(carpeta_destino, os.path.splitext(os.path.basename(origen))[0])
+            destino = base + extension
+            copia = 2
+            while destino in usados or os.path.exists(destino):
+                destino = f"{base} ({copia}){extension}"
+                copia += 1
+            usados.add(destino)
+            tareas.append(TareaExportacion(destino, formato, origen=origen))
+
+        for tarea in tareas:
+            self._lanzar(tarea)
+
+    def cancelar(self):
+        """
+        Cancela las exportaciones pendientes y en curso.
+        """
+        for tarea in self._tareas.values():
+            tarea.cancelar()
+
+    def _lanzar(self, tarea):
+        if tarea.destino in self._tareas:
+            raise ValueError(f"Ya se está exportando a {tarea.destino}")
+        if not self._tareas:
+            self._correctas = 0
+            self._total = 0
+
+        tarea.senales.progreso.connect(self._on_progreso)
+        tarea.senales.terminado.connect(self._on_terminado)
+        tarea.senales.error.connect(self._on_error)
+        tarea.senales.cancelado.connect(self._on_fin)
+
+        self._tareas[tarea.destino] = tarea
+        self._progreso[tarea.destino] = 0
+        self._total += 1
+        self.pool.start(tarea)
+        self._emitir_progreso()
+
+    def _on_progreso(self, destino, porcentaje):
+        if destino in self._progreso:
+            self._progreso[destino] = porcentaje
+            self._emitir_progreso()
+
+    def _on_terminado(self, destino):
+        self._correctas += 1
+        self.archivoExportado.emit(destino)
+        self._on_fin(destino)
+
+    def _on_error(self, destino, mensaje):
+        self.errorExportacion.emit(destino, mensaje)
+        self._on_fin(destino)
+
+    def _on_fin(self, destino):
+        self._tareas.pop(destino, None)
+        self._progreso[destino] = 100
+        if self._tareas:
+            self._emitir_progreso()
+            return
+        self._progreso.clear()
+        self.progresoCambiado.emit(100)
+        self.exportacionFinalizada.emit(self._correctas, self._total)
+
+    def _emitir_progreso(self):
+        if self._progreso:
+            self.progresoCambiado.emit(sum(self._progreso.values()) // len(self._progreso))
@@ -0,0 +1,709 @@
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import time
+import zlib
+from collections import deque
+from contextlib import contextmanager
+
+from PyQt5.QtCore import QObject, QEvent, QStandardPaths, pyqtSignal
+from PyQt5.QtGui import QKeySequence, QTextCursor
+
+
+# Coste aproximado (en bytes) de cada cambio además de su texto
+_SOBRECOSTE_CAMBIO = 64
+
+# Versión del formato del historial persistente
+_VERSION_HISTORIAL = 2
+
+# Cabecera de cada segmento comprimido: (longitud en disco, tamaño aproximado en memoria)
+_CABECERA_SEGMENTO = struct.Struct(">II")
+
+# Limpieza de historiales persistentes antiguos
+_DIAS_CONSERVACION = 30
+_MAX_HISTORIALES = 100
+
+
+def _prefijo_comun(a, b, limite):
+    """
+    Longitud del prefijo común de dos cadenas (búsqueda binaria sobre
+    comparaciones de slices, que se ejecutan en C).
+    """
+    bajo, alto = 0, limite
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if a[:medio] == b[:medio]:
+            bajo = medio
+        else:
+            alto = medio - 1
+    return bajo
+
+
+def _sufijo_comun(a, b, limite):
+    """
+    Longitud del sufijo común de dos cadenas, sin superar `limite`.
+    """
+    bajo, alto = 0, limite
+    while bajo < alto:
+        medio = (bajo + alto + 1) // 2
+        if a[len(a) - medio:] == b[len(b) - medio:]:
+            bajo = medio
+        else:
+            alto = medio - 1
+    return bajo
+
+
+def calcular_cambio(antes, despues, posicion=0):
+    """
+    Calcula el delta mínimo entre dos versiones de un texto.
+
+    Args:
+        antes (str): Texto anterior
+        despues (str): Texto nuevo
+        posicion (int): Posición de Qt en la que empiezan ambos textos
+
+    Returns:
+        tuple | None: (posicion, eliminado, insertado) con la posición en
+                      unidades UTF-16 de Qt, o None si no hay cambios
+    """
+    if antes == despues:
+        return None
+    limite = min(len(antes), len(despues))
+    inicio = _prefijo_comun(antes, despues, limite)
+    fin = _sufijo_comun(antes, despues, limite - inicio)
+    return (posicion + largo_qt(antes[:inicio]),
+            antes[inicio:len(antes) - fin], despues[inicio:len(despues) - fin])
+
+
+def hash_texto(texto):
+    """
+    Hash SHA-256 del texto, usado para validar el historial persistente.
+    """
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def largo_qt(texto):
+    """
+    Longitud del texto en unidades UTF-16, que es como cuenta posiciones Qt.
+    """
+    return len(texto.encode("utf-16-le")) // 2
+
+
+def _indice_python(texto, posicion):
+    """
+    Convierte una posición de Qt (UTF-16) a índice de Python (puntos de código).
+    Solo se usa cuando el texto contiene caracteres fuera del plano básico.
+    """
+    return len(texto.encode("utf-16-le")[:2 * posicion].decode("utf-16-le", "ignore"))
+
+
+def _trama(objeto, tamano=0):
+    """
+    Serializa y comprime un objeto JSON como segmento con cabecera.
+    """
+    datos = zlib.compress(json.dumps(objeto, ensure_ascii=False).encode("utf-8"))
+    return _CABECERA_SEGMENTO.pack(len(datos), tamano) + datos
+
+
+def _leer_trama(archivo):
+    """
+    Lee el siguiente segmento (cabecera incluida) de un archivo abierto.
+
+    Returns:
+        bytes: Segmento completo, tal como está en disco
+    """
+    cabecera = archivo.read(_CABECERA_SEGMENTO.size)
+    if len(cabecera) != _CABECERA_SEGMENTO.size:
+        raise ValueError("Historial truncado")
+    longitud, _ = _CABECERA_SEGMENTO.unpack(cabecera)
+    datos = archivo.read(longitud)
+    if len(datos) != longitud:
+        raise ValueError("Historial truncado")
+    return cabecera + datos
+
+
+def _abrir_trama(trama):
+    return json.loads(zlib.decompress(trama[_CABECERA_SEGMENTO.size:]).decode("utf-8"))
+
+
+def _lotes(pasos, maximo):
+    """
+    Reparte los pasos en lotes consecutivos de tamaño aproximado <= maximo.
+    """
+    lote, tamano = [], 0
+    for paso in pasos:
+        if lote and tamano + paso.tamano > maximo:
+            yield lote
+            lote, tamano = [], 0
+        lote.append(paso)
+        tamano += paso.tamano
+    if lote:
+        yield lote
+
+
+class PasoHistorial:
+    """
+    Un paso deshacible del historial.
+
+    Guarda una lista compacta de cambios (posicion, eliminado, insertado)
+    que se aplican en orden para rehacer y en orden inverso para deshacer.
+    """
+
+    __slots__ = ("cambios", "marca", "fusionable", "tamano")
+
+    def __init__(self, cambios, marca=0.0, fusionable=False):
+        self.cambios = cambios
+        self.marca = marca
+        self.fusionable = fusionable
+        self.tamano = sum(_SOBRECOSTE_CAMBIO + len(e) + len(i) for _, e, i in cambios)
+
+    def fusionar(self, cambio):
+        """
+        Intenta unir un cambio de tecleo contiguo a este paso.
+
+        Args:
+            cambio (tuple): (posicion, eliminado, insertado)
+
+        Returns:
+            bool: True si el cambio se ha fusionado
+        """
+        if len(self.cambios) != 1:
+            return False
+        pos, eliminado, insertado = self.cambios[0]
+        c_pos, c_eliminado, c_insertado = cambio
+
+        if not eliminado and not c_eliminado and c_pos == pos + largo_qt(insertado):
+            # Escritura continua
+            nuevo = (pos, "", insertado + c_insertado)
+        elif not insertado and not c_insertado and c_pos + largo_qt(c_eliminado) == pos:
+            # Retroceso (Backspace) continuo
+            nuevo = (c_pos, c_eliminado + eliminado, "")
+        elif not insertado and not c_insertado and c_pos == pos:
+            # Suprimir (Delete) continuo
+            nuevo = (pos, eliminado + c_eliminado, "")
+        else:
+            return False
+
+        self.cambios[0] = nuevo
+        self.tamano = _SOBRECOSTE_CAMBIO + len(nuevo[1]) + len(nuevo[2])
+        return True
+
+
+def _empaquetar(pasos):
+    return _trama([p.cambios for p in pasos], sum(p.tamano for p in pasos))
+
+
+def _desempaquetar(trama):
+    return [PasoHistorial([tuple(c) for c in cambios]) for cambios in _abrir_trama(trama)]
+
+
+class HistorialEdicion(QObject):
+    """
+    Historial de deshacer/rehacer con memoria acotada y persistencia.
+
+    Sustituye la pila de deshacer de QTextDocument: registra los deltas de
+    `contentsChange`, agrupa el tecleo consecutivo en un único paso y, cuando
+    se supera el presupuesto de memoria, vuelca los pasos más antiguos a un
+    registro comprimido en disco del que se recuperan al deshacer. Ese
+    registro también está acotado: al superar `limite_disco_bytes` se
+    descartan los pasos más antiguos.
+
+    Solo guarda texto plano, así que el editor debe ser de texto plano
+    (`setAcceptRichText(False)`): el formato de un texto borrado no se
+    recupera al deshacer y los cambios que solo afectan al formato no se
+    registran.
+
+    Señales:
+        puedeDeshacerCambiado(bool): Emitida cuando cambia la disponibilidad de deshacer
+        puedeRehacerCambiado(bool): Emitida cuando cambia la disponibilidad de rehacer
+
+    Parámetros:
+        editor (QTextEdit): Editor cuyo documento se controla
+        presupuesto_bytes (int): Memoria aproximada máxima del historial (default: 4 MB)
+        limite_disco_bytes (int): Historial máximo volcado a disco y persistido (default: 32 MB)
+        umbral_fusion (float): Segundos máximos entre pulsaciones para fusionarlas (default: 1.0)
+        parent (QObject): Objeto padre (opcional)
+    """
+
+    puedeDeshacerCambiado = pyqtSignal(bool)
+    puedeRehacerCambiado = pyqtSignal(bool)
+
+    def __init__(self, editor, presupuesto_bytes=4 * 1024 * 1024,
+                 limite_disco_bytes=32 * 1024 * 1024, umbral_fusion=1.0, parent=None):
+        """
+        Constructor del historial de edición.
+
+        Args:
+            editor (QTextEdit): Editor cuyo documento se controla
+            presupuesto_bytes (int): Memoria aproximada máxima del historial
+            limite_disco_bytes (int): Historial máximo volcado a disco y persistido
+            umbral_fusion (float): Segundos máximos entre pulsaciones fusionables
+            parent (QObject): Objeto padre (opcional)
+        """
+        super().__init__(parent)
+        self.editor = editor
+        self.documento = editor.document()
+        self.presupuesto_bytes = max(1024, int(presupuesto_bytes))
+        self.limite_disco_bytes = max(1024, int(limite_disco_bytes))
+        self.umbral_fusion = float(umbral_fusion)
+
+        self._deshacer = deque()
+        self._rehacer = deque()
+        self._bytes = 0
+        self._volcado = None
+        self._segmentos = []
+        self._bytes_disco = 0
+        self._grupo = None
+        self._nivel_grupo = 0
+        self._aplicando = False
+        self._suspendido = False
+        self._estado = (False, False)
+        self._sincronizar_copia()
+
+        # El historial propio sustituye al de Qt (que no tiene límite)
+        self.documento.setUndoRedoEnabled(False)
+        self.documento.contentsChange.connect(self._on_contents_change)
+        self.editor.installEventFilter(self)
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def puede_deshacer(self):
+        return bool(self._deshacer or self._segmentos)
+
+    def puede_rehacer(self):
+        return bool(self._rehacer)
+
+    def deshacer(self):
+        """
+        Deshace el último paso, recuperándolo del disco si hace falta.
+        """
+        if not self._deshacer and self._segmentos:
+            try:
+                self._recuperar_segmento()
+            except (OSError, ValueError, zlib.error):
+                # Registro en disco dañado: se pierde lo más antiguo
+                self._segmentos = []
+                self._bytes_disco = 0
+        if not self._deshacer:
+            return
+        paso = self._deshacer.pop()
+        paso.fusionable = False
+        self._aplicar([(p, i, e) for p, e, i in reversed(paso.cambios)])
+        self._rehacer.append(paso)
+        self._ajustar_presupuesto()
+        self._emitir_estado()
+
+    def rehacer(self):
+        """
+        Vuelve a aplicar el último paso deshecho.
+        """
+        if not self._rehacer:
+            return
+        paso = self._rehacer.pop()
+        self._aplicar(paso.cambios)
+        self._deshacer.append(paso)
+        self._emitir_estado()
+
+    def iniciar_grupo(self):
+        """
+        Agrupa los cambios siguientes en un único paso hasta `terminar_grupo`.
+        Admite anidamiento.
+        """
+        if self._nivel_grupo == 0:
+            self._grupo = []
+        self._nivel_grupo += 1
+
+    def terminar_grupo(self):
+        """
+        Cierra el grupo abierto con `iniciar_grupo` y lo registra como un paso.
+        """
+        if self._nivel_grupo == 0:
+            return
+        self._nivel_grupo -= 1
+        if self._nivel_grupo > 0:
+            return
+        cambios, self._grupo = self._grupo, None
+        if cambios:
+            self._apilar(PasoHistorial(cambios, time.monotonic()))
+            self._emitir_estado()
+
+    def reiniciar(self):
+        """
+        Vacía el historial (memoria y disco) y lo sincroniza con el documento.
+        """
+        self._deshacer.clear()
+        self._rehacer.clear()
+        self._bytes = 0
+        self._segmentos = []
+        self._bytes_disco = 0
+        self._grupo = None
+        self._nivel_grupo = 0
+        if self._volcado is not None:
+            self._volcado.close()
+            self._volcado = None
+        self._sincronizar_copia()
+        self._emitir_estado()
+
+    @contextmanager
+    def reemplazo_documento(self):
+        """
+        Sustituye el documento entero sin registrarlo (nuevo, abrir...).
+        Al salir, el historial queda vacío y sincronizado con el documento.
+
+        Ejemplo:
+            with historial.reemplazo_documento():
+                editor.setPlainText(texto)
+        """
+        self._suspendido = True
+        try:
+            yield
+        finally:
+            self._suspendido = False
+            self.reiniciar()
+
+    def guardar(self, ruta_archivo):
+        """
+        Guarda el historial junto al hash del contenido actual.
+
+        Los segmentos ya volcados se copian comprimidos tal cual, sin
+        cargarlos en memoria, así que el archivo queda acotado por
+        `limite_disco_bytes` más el presupuesto en memoria.
+
+        Args:
+            ruta_archivo (str): Archivo de texto al que pertenece el historial
+
+        Returns:
+            bool: True si se ha guardado correctamente
+        """
+        lote_maximo = self.presupuesto_bytes // 2
+        memoria = [_empaquetar(lote) for lote in _lotes(self._deshacer, lote_maximo)]
+        rehacer = [_empaquetar(lote) for lote in _lotes(self._rehacer, lote_maximo)]
+        cabecera = {
+            "version": _VERSION_HISTORIAL,
+            "hash": hash_texto(self._texto),
+            "deshacer": len(self._segmentos) + len(memoria),
+            "rehacer": len(rehacer),
+        }
+        ruta = self.ruta_persistente(ruta_archivo)
+        temporal = ruta + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(temporal, "wb") as f:
+                f.write(_trama(cabecera))
+                for inicio, _ in self._segmentos:
+                    self._volcado.seek(inicio)
+                    f.write(_leer_trama(self._volcado))
+                for trama in memoria + rehacer:
+                    f.write(trama)
+            os.replace(temporal, ruta)
+        except (OSError, ValueError):
+            return False
+        self.limpiar_historiales(os.path.dirname(ruta))
+        return True
+
+    def cargar(self, ruta_archivo):
+        """
+        Restaura el historial guardado si el contenido del documento coincide
+        con el hash almacenado. Si no coincide, el historial se descarta.
+
+        Los pasos a deshacer pasan segmento a segmento al registro en disco
+        y solo se descomprimen cuando se llega a ellos al deshacer.
+
+        Args:
+            ruta_archivo (str): Archivo de texto al que pertenece el historial
+
+        Returns:
+            bool: True si se ha restaurado el historial
+        """
+        self.reiniciar()
+        try:
+            with open(self.ruta_persistente(ruta_archivo), "rb") as f:
+                cabecera = _abrir_trama(_leer_trama(f))
+                if cabecera.get("version") != _VERSION_HISTORIAL:
+                    return False
+                if cabecera.get("hash") != hash_texto(self._texto):
+                    return False
+                for _ in range(cabecera["deshacer"]):
+                    self._anadir_segmento(_leer_trama(f))
+                for _ in range(cabecera["rehacer"]):
+                    for paso in _desempaquetar(_leer_trama(f)):
+                        self._rehacer.append(paso)
+                        self._bytes += paso.tamano
+                    self._recortar_rehacer()
+        except (OSError, ValueError, KeyError, TypeError, AttributeError, zlib.error):
+            self.reiniciar()
+            return False
+
+        self._emitir_estado()
+        return True
+
+    @staticmethod
+    def limpiar_historiales(carpeta, dias=_DIAS_CONSERVACION, maximo=_MAX_HISTORIALES):
+        """
+        Elimina los historiales persistentes sin usar en `dias` días y, si
+        aun así quedan más de `maximo`, los más antiguos.
+
+        Args:
+            carpeta (str): Carpeta de historiales
+            dias (int): Antigüedad máxima en días
+            maximo (int): Número máximo de historiales conservados
+        """
+        try:
+            nombres = [n for n in os.listdir(carpeta) if n.endswith((".hist", ".tmp"))]
+        except OSError:
+            return
+        archivos = []
+        for nombre in nombres:
+            ruta = os.path.join(carpeta, nombre)
+            try:
+                archivos.append((os.path.getmtime(ruta), ruta))
+            except OSError:
+                pass
+
+        archivos.sort(reverse=True)
+        limite = time.time() - dias * 24 * 3600
+        for posicion, (modificado, ruta) in enumerate(archivos):
+            if posicion >= maximo or modificado < limite:
+                try:
+                    os.remove(ruta)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def ruta_persistente(ruta_archivo):
+        """
+        Ruta del archivo de historial asociado a un documento.
+        """
+        base = QStandardPaths.writableLocation(QStandardPaths.AppLocalDataLocation)
+        clave = hashlib.sha1(os.path.abspath(ruta_archivo).encode("utf-8")).hexdigest()
+        return os.path.join(base, "historial", clave + ".hist")
+
+    # ------------------------------------------------------------------
+    # Registro de cambios
+    # ------------------------------------------------------------------
+
+    def _sincronizar_copia(self):
+        """
+        Vuelve a leer la copia del texto completo del documento.
+
+        Se usa el texto "en bruto" (separadores de párrafo U+2029) porque
+        es el que corresponde uno a uno con las posiciones de QTextCursor.
+        """
+        self._texto = self.documento.toRawText()
+        self._largo_qt = self.documento.characterCount() - 1
+        self._solo_bmp = self._largo_qt == len(self._texto)
+
+    def _leer_cambio(self, posicion, eliminados, anadidos):
+        """
+        Construye el delta a partir de los datos de `contentsChange`.
+
+        El texto eliminado sale de la copia `_texto` y el insertado se lee
+        del documento con un cursor, así que el coste depende solo del tamaño
+        del cambio. Qt a veces informa del documento entero con longitudes
+        que incluyen el separador final; en ese caso se compara el texto
+        completo.
+        """
+        largo_nuevo = self.documento.characterCount() - 1
+        if (posicion + eliminados > self._largo_qt
+                or largo_nuevo != self._largo_qt - eliminados + anadidos):
+            antes = self._texto
+            self._sincronizar_copia()
+            return calcular_cambio(antes, self._texto)
+
+        cursor = QTextCursor(self.documento)
+        cursor.setPosition(posicion)
+        cursor.setPosition(posicion + anadidos, QTextCursor.KeepAnchor)
+        insertado = cursor.selectedText()
+
+        if self._solo_bmp:
+            inicio, fin = posicion, posicion + eliminados
+        else:
+            inicio = _indice_python(self._texto, posicion)
+            fin = _indice_python(self._texto, posicion + eliminados)
+        eliminado = self._texto[inicio:fin]
+
+        self._texto = self._texto[:inicio] + insertado + self._texto[fin:]
+        self._largo_qt = largo_nuevo
+        if self._solo_bmp and len(insertado) != anadidos:
+            self._solo_bmp = False
+
+        # Los bloques de edición informan del rango total, que puede
+        # incluir texto sin cambios en los extremos
+        return calcular_cambio(eliminado, insertado, posicion)
+
+    def _on_contents_change(self, posicion, eliminados, anadidos):
+        if self._suspendido:
+            # La copia del texto se vuelve a leer al terminar el reemplazo
+            return
+        cambio = self._leer_cambio(posicion, eliminados, anadidos)
+        if cambio is None or self._aplicando:
+            # Cambio solo de formato, o lo está aplicando el propio historial
+            return
+
+        for paso in self._rehacer:
+            self._bytes -= paso.tamano
+        self._rehacer.clear()
+
+        if self._grupo is not None:
+            self._grupo.append(cambio)
+            self._emitir_estado()
+            return
+
+        ahora = time.monotonic()
+        _, eliminado, insertado = cambio
+        tecleo = len(eliminado) + len(insertado) == 1 and insertado != "\u2029"
+        ultimo = self._deshacer[-1] if self._deshacer else None
+
+        if (tecleo and ultimo is not None and ultimo.fusionable
+                and ahora - ultimo.marca <= self.umbral_fusion):
+            tamano = ultimo.tamano
+            if ultimo.fusionar(cambio):
+                ultimo.marca = ahora
+                self._bytes += ultimo.tamano - tamano
+                self._emitir_estado()
+                return
+
+        self._apilar(PasoHistorial([cambio], ahora, tecleo))
+        self._emitir_estado()
+
+    def _apilar(self, paso):
+        self._deshacer.append(paso)
+        self._bytes += paso.tamano
+        if self._bytes > self.presupuesto_bytes:
+            self._volcar()
+
+    def _ajustar_presupuesto(self):
+        """
+        Mantiene ambas pilas dentro del presupuesto tras deshacer.
+
+        Primero se descartan los pasos a rehacer más lejanos; volcar antes
+        la pila de deshacer haría que cada deshacer recuperase y volviese a
+        volcar el mismo segmento.
+        """
+        self._recortar_rehacer()
+        if self._bytes > self.presupuesto_bytes:
+            self._volcar()
+
+    def _recortar_rehacer(self):
+        """
+        Descarta los pasos a rehacer más antiguos (los más alejados del
+        estado actual) mientras se supere el presupuesto.
+        """
+        while len(self._rehacer) > 1 and self._bytes > self.presupuesto_bytes:
+            self._bytes -= self._rehacer.popleft().tamano
+
+    def _aplicar(self, cambios):
+        """
+        Aplica una secuencia de cambios al documento sin registrarlos.
+        """
+        cursor = QTextCursor(self.documento)
+        self._aplicando = True
+        try:
+            cursor.beginEditBlock()
+            for pos, eliminado, insertado in cambios:
+                cursor.setPosition(pos)
+                cursor.setPosition(pos + largo_qt(eliminado), QTextCursor.KeepAnchor)
+                cursor.insertText(insertado)
+            cursor.endEditBlock()
+        finally:
+            self._aplicando = False
+        self.editor.setTextCursor(cursor)
+
+    # ------------------------------------------------------------------
+    # Volcado a disco
+    # ------------------------------------------------------------------
+
+    def _volcar(self):
+        """
+        Mueve los pasos más antiguos a un segmento comprimido en disco
+        hasta dejar el historial en memoria a la mitad del presupuesto.
+        """
+        objetivo = self.presupuesto_bytes // 2
+        lote = []
+        while len(self._deshacer) > 1 and self._bytes > objetivo:
+            paso = self._deshacer.popleft()
+            self._bytes -= paso.tamano
+            lote.append(paso)
+        if lote:
+            self._anadir_segmento(_empaquetar(lote))
+
+    def _anadir_segmento(self, trama):
+        """
+        Añade un segmento (el más reciente) al registro en disco.
+        """
+        if self._volcado is None:
+            self._volcado = tempfile.TemporaryFile(prefix="miniword-historial-")
+        _, tamano = _CABECERA_SEGMENTO.unpack_from(trama)
+        self._volcado.seek(0, os.SEEK_END)
+        self._segmentos.append((self._volcado.tell(), tamano))
+        self._volcado.write(trama)
+        self._bytes_disco += tamano
+        self._recortar_disco()
+
+    def _recortar_disco(self):
+        """
+        Descarta los segmentos más antiguos si se supera `limite_disco_bytes`
+        y compacta el archivo cuando más de la mitad ya no se usa.
+        """
+        while len(self._segmentos) > 1 and self._bytes_disco > self.limite_disco_bytes:
+            _, tamano = self._segmentos.pop(0)
+            self._bytes_disco -= tamano
+
+        final = self._volcado.seek(0, os.SEEK_END)
+        if self._segmentos and self._segmentos[0][0] > final // 2:
+            nuevo = tempfile.TemporaryFile(prefix="miniword-historial-")
+            segmentos = []
+            for inicio, tamano in self._segmentos:
+                self._volcado.seek(inicio)
+                segmentos.append((nuevo.tell(), tamano))
+                nuevo.write(_leer_trama(self._volcado))
+            self._volcado.close()
+            self._volcado, self._segmentos = nuevo, segmentos
+
+    def _recuperar_segmento(self):
+        """
+        Trae a memoria el segmento más reciente del disco y lo elimina del registro.
+        """
+        inicio, tamano = self._segmentos.pop()
+        self._bytes_disco -= tamano
+        self._volcado.seek(inicio)
+        pasos = _desempaquetar(_leer_trama(self._volcado))
+        self._volcado.truncate(inicio)
+        for paso in reversed(pasos):
+            self._deshacer.appendleft(paso)
+            self._bytes += paso.tamano
+
+    # ------------------------------------------------------------------
+    # Estado y atajos de teclado
+    # ------------------------------------------------------------------
+
+    def _emitir_estado(self):
+        estado = (self.puede_deshacer(), self.puede_rehacer())
+        if estado == self._estado:
+            return
+        if estado[0] != self._estado[0]:
+            self.puedeDeshacerCambiado.emit(estado[0])
+        if estado[1] != self._estado[1]:
+            self.puedeRehacerCambiado.emit(estado[1])
+        self._estado = estado
+
+    def eventFilter(self, obj, event):
+        """
+        Redirige Ctrl+Z / Ctrl+Y del editor a este historial, ya que
+        QTextEdit los consume internamente aunque su pila esté desactivada.
+        """
+        if obj is self.editor and event.type() in (QEvent.ShortcutOverride, QEvent.KeyPress):
+            if event.matches(QKeySequence.Undo) or event.matches(QKeySequence.Redo):
+                if event.type() == QEvent.ShortcutOverride:
+                    # Dejar que actúe el atajo de la QAction, si existe
+                    event.ignore()
+                elif event.matches(QKeySequence.Undo):
+                    self.deshacer()
+                else:
+                    self.rehacer()
+                return True
+        return super().eventFilter(obj, event)